@@ -1,29 +1,90 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import uvicorn
 import os
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 import logging
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
-from dateutil import parser
-import pytz
-import psycopg2
-import io
-import uuid         
+from psycopg2 import OperationalError
 from psycopg2.extras import execute_values 
-import hashlib, uuid
+from psycopg2.pool import ThreadedConnectionPool, PoolError
+import hashlib
+import csv
 import asyncio
+from contextlib import contextmanager, asynccontextmanager
+from decimal import Decimal, ROUND_HALF_UP
+import threading
+import time
+import uuid
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s | %(asctime)s | %(message)s")
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Clinical Data ETL Service", version="1.0.0")
 
+# Read once at import; the environment does not change while the service runs
+DEVELOPMENT = bool(os.getenv('DEVELOPMENT'))
+
+class JobStore:
+    """
+    In-process job state, striped over SHARDS dicts each behind its own lock.
+
+    Handlers read while ETL worker threads write; a per-shard lock keeps
+    multi-field updates atomic without serializing every job behind one
+    mutex. Readers get a snapshot copy, never the live dict.
+
+    Jobs that reach a final status are evicted RETENTION_SECONDS later (swept
+    on the next create in the same shard), so the store does not grow with
+    every job ever submitted; their final state stays in etl_jobs.
+    """
+
+    SHARDS = 16
+    RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+    FINAL_STATUSES = frozenset({"completed", "failed"})
+
+    def __init__(self):
+        self._shards: list[Dict[str, Dict[str, Any]]] = [{} for _ in range(self.SHARDS)]
+        self._expiry: list[Dict[str, float]] = [{} for _ in range(self.SHARDS)]
+        self._locks = [threading.Lock() for _ in range(self.SHARDS)]
+
+    def _shard(self, job_id: str) -> int:
+        return hash(job_id) % self.SHARDS
+
+    def _evict_expired(self, i: int) -> None:
+        now = time.monotonic()
+        expired = [job_id for job_id, at in self._expiry[i].items() if at <= now]
+        for job_id in expired:
+            del self._expiry[i][job_id]
+            self._shards[i].pop(job_id, None)
+
+    def create(self, job_id: str, fields: Dict[str, Any]) -> None:
+        i = self._shard(job_id)
+        with self._locks[i]:
+            self._evict_expired(i)
+            self._expiry[i].pop(job_id, None)
+            self._shards[i][job_id] = dict(fields)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        i = self._shard(job_id)
+        with self._locks[i]:
+            self._shards[i][job_id].update(fields)
+            if fields.get("status") in self.FINAL_STATUSES:
+                self._expiry[i][job_id] = time.monotonic() + self.RETENTION_SECONDS
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        i = self._shard(job_id)
+        with self._locks[i]:
+            job = self._shards[i].get(job_id)
+            return dict(job) if job is not None else None
+
 # In-memory job storage (for demo purposes)
 # In production, this would use a proper database or job queue
-jobs: Dict[str, Dict[str, Any]] = {}
+jobs = JobStore()
 
 class ETLJobRequest(BaseModel):
     jobId: str
@@ -41,73 +102,312 @@ class ETLJobStatus(BaseModel):
     progress: Optional[int] = None
     message: Optional[str] = None
 
+# Shared PostgreSQL connection pool, opened at startup when possible and
+# otherwise on first use, so the service can still boot (and answer
+# /health) without a reachable database.
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_MIN_CONN = int(os.getenv("DB_POOL_MIN_CONN", "1"))
+DB_POOL_MAX_CONN = int(os.getenv("DB_POOL_MAX_CONN", "8"))
+# Each running job holds one pooled connection for its whole load; keep two
+# spare so status writes and job lookups never find the pool exhausted
+ETL_MAX_CONCURRENT_JOBS = int(os.getenv("ETL_MAX_CONCURRENT_JOBS", str(max(1, DB_POOL_MAX_CONN - 2))))
+_db_pool: Optional[ThreadedConnectionPool] = None
+_db_pool_lock = threading.Lock()
+
+def get_db_pool() -> ThreadedConnectionPool:
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = ThreadedConnectionPool(DB_POOL_MIN_CONN, DB_POOL_MAX_CONN, DATABASE_URL)
+    return _db_pool
+
+@contextmanager
+def get_db_connection():
+    """Borrow a pooled connection; any open transaction is rolled back on error."""
+    pool = get_db_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+@asynccontextmanager
+async def get_async_db_connection():
+    """
+    get_db_connection for coroutines: opening the pool, checking out a
+    connection (which may dial Postgres), the rollback on error and the
+    return all run in worker threads rather than on the event loop.
+    """
+    pool = await asyncio.to_thread(get_db_pool)
+    conn = await asyncio.to_thread(pool.getconn)
+    try:
+        yield conn
+    except Exception:
+        if not conn.closed:
+            await asyncio.to_thread(conn.rollback)
+        raise
+    finally:
+        await asyncio.to_thread(pool.putconn, conn, close=bool(conn.closed))
+
+@app.on_event("startup")
+def open_db_pool():
+    """Warm the pool at boot so the first job does not pay the connection handshakes."""
+    if not DATABASE_URL:
+        return
+    try:
+        get_db_pool()
+    except OperationalError as exc:
+        # Postgres may still be starting; get_db_pool() retries on first use
+        logger.warning(f"Database pool not opened at startup: {exc}")
+
+@app.on_event("shutdown")
+def close_db_pool():
+    global _db_pool
+    if _db_pool is not None:
+        _db_pool.closeall()
+        _db_pool = None
+
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "etl"}
 
-async def extract_file(job_id: str, filename: str) -> Optional[pd.DataFrame]:
-    """Read a CSV file from the mounted **/data** volume and update job metadata."""
+STRING_COLUMNS = frozenset({'study_id', 'participant_id', 'measurement_type', 'unit', 'site_id'})
+
+# Repeat across most rows of a file; dictionary-encoded on extraction and
+# held as pandas categoricals from there on
+CATEGORY_COLUMNS = frozenset({'measurement_type', 'unit', 'site_id'})
+
+# 'id' is optional: a file that supplies its own measurement ids keeps them,
+# otherwise load_data derives deterministic ones
+CSV_COLUMNS = ['id', 'study_id', 'participant_id', 'measurement_type', 'value', 'unit',
+               'timestamp', 'site_id', 'quality_score']
+
+# The CSV is streamed in blocks of roughly CSV_BLOCK_SIZE bytes, each parsed
+# in parallel by Arrow. Every known column is read as text: per-block type
+# inference would otherwise type the same column differently across
+# chunks, and transform_data owns all type coercion anyway.
+CSV_BLOCK_SIZE = 8 << 20
+
+def _normalize_column(name: str) -> str:
+    return name.lower().strip().replace(" ", "_")
+
+def _csv_convert_options(file_path: str) -> pacsv.ConvertOptions:
+    """
+    Peek at the header line and project the reader onto CSV_COLUMNS, so
+    Arrow neither parses nor converts any other source column. Options are
+    keyed by the raw header names, which may differ from the normalized ones
+    (e.g. "Study ID").
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        header = next(csv.reader(f), [])
+    known = set(CSV_COLUMNS)
+    wanted = [raw for raw in header if _normalize_column(raw) in known]
+    return pacsv.ConvertOptions(
+        column_types={raw: pa.string() for raw in wanted},
+        include_columns=wanted,
+        strings_can_be_null=True,
+    )
+
+# Remaining text columns stay Arrow-backed in pandas (one offsets + data
+# buffer per column) instead of becoming one Python str object per cell
+_ARROW_STRINGS = {pa.string(): pd.StringDtype("pyarrow")}
+
+def _batch_to_frame(batch: pa.RecordBatch) -> pd.DataFrame:
+    """
+    Normalize one CSV block while it is still columnar Arrow data:
+    lower-case/underscore the headers and trim whitespace from the string
+    fields with Arrow's UTF-8 kernel, before any Python objects exist.
+    CATEGORY_COLUMNS are dictionary-encoded in the same sweep and so arrive
+    in pandas as categoricals; the other text columns convert to
+    `string[pyarrow]`, so no column gets a str object per row.
+    """
+    names = [_normalize_column(c) for c in batch.schema.names]
+    arrays = []
+    for name, arr in zip(names, batch.columns):
+        if name in STRING_COLUMNS:
+            if not pa.types.is_string(arr.type):
+                arr = pc.cast(arr, pa.string())
+            arr = pc.utf8_trim_whitespace(arr)
+            # A field of only whitespace is as empty as a missing one
+            arr = pc.if_else(pc.equal(arr, ""), pa.scalar(None, pa.string()), arr)
+            if name in CATEGORY_COLUMNS:
+                arr = pc.dictionary_encode(arr)
+        arrays.append(arr)
+    return pa.RecordBatch.from_arrays(arrays, names=names).to_pandas(types_mapper=_ARROW_STRINGS.get)
+
+def _stream_frames(source: pa.NativeFile, reader: pacsv.CSVStreamingReader) -> Iterator[pd.DataFrame]:
+    """Yield one normalized DataFrame per CSV block, unmapping the file when done."""
+    try:
+        for batch in reader:
+            yield _batch_to_frame(batch)
+    finally:
+        source.close()
+
+def extract_file(job_id: str, filename: str) -> Optional[Iterator[pd.DataFrame]]:
+    """Open a streaming reader over a CSV file in the mounted **/data** volume.
+
+    Returns an iterator of DataFrame chunks (one per CSV block), or None if the
+    file is missing or its first block cannot be parsed.
+    """
 
     file_path = f"/data/{filename}"
 
     if not os.path.exists(file_path):
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["message"] = f"File not found: {filename}"
+        jobs.update(job_id, status="failed", message=f"File not found: {filename}")
         return None
 
     try:
-        df = pd.read_csv(file_path)
-        jobs[job_id]["progress"] = 10  # 10 % after extraction
-        jobs[job_id]["message"] = f"Extracted {len(df)} rows"
-        return df
+        # Map the file instead of read()-ing it through a second buffer: Arrow
+        # parses straight out of the page cache, whose pages the kernel can
+        # reclaim under memory pressure
+        source = pa.memory_map(file_path, "r")
     except Exception as exc:
-        jobs[job_id]["status"] = "failed"
-        jobs[job_id]["message"] = f"Extraction error: {exc}"
+        jobs.update(job_id, status="failed", message=f"Extraction error: {exc}")
         return None
+    try:
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE, use_threads=True),
+            convert_options=_csv_convert_options(file_path),
+        )
+    except Exception as exc:
+        source.close()
+        jobs.update(job_id, status="failed", message=f"Extraction error: {exc}")
+        return None
+    jobs.update(job_id, progress=10, message=f"Streaming {filename}")  # 10 % after extraction
+    return _stream_frames(source, reader)
+
+# The Arrow cast kernels below parse a whole column in one C pass but reject
+# it outright on a single value they cannot read (a timestamp without a zone
+# offset, a number with spaces or junk), so each falls back to the pandas
+# parser, which also decides the error behaviour.
+
+def _parse_timestamps(s: pd.Series) -> pd.Series:
+    """ISO-8601 text → datetime64[ns, UTC]."""
+    try:
+        # Parsing straight to ns wraps years outside 1677-2262 around silently;
+        # parsed as us first, the checked cast to ns rejects them instead
+        arr = pc.cast(pa.array(s, type=pa.string(), from_pandas=True), pa.timestamp("us", tz="UTC"))
+        arr = pc.cast(arr, pa.timestamp("ns", tz="UTC"))
+        return pd.Series(arr.to_pandas(), index=s.index, name=s.name)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pd.to_datetime(s, utc=True, format='ISO8601')
+
+def _parse_numbers(s: pd.Series) -> np.ndarray:
+    """Numeric text → writable float64 ndarray, unparseable values as NaN."""
+    try:
+        arr = pc.cast(pa.array(s, type=pa.string(), from_pandas=True), pa.float64())
+        return arr.to_numpy(zero_copy_only=False, writable=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return pd.to_numeric(s, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
 
-async def transform_data(job_id: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
+def _typed_value_text(s: pd.Series) -> pa.Array:
+    """
+    Render `value` as the original loader stored it, and so as ids have
+    always keyed it. pd.read_csv inferred the column's type and to_csv wrote
+    it back: int64 when every entry is an integer ("+5" stored as "5"),
+    float64 when every entry is numeric or missing ("180" as "180.0", "1e2"
+    as "100.0"), and otherwise the raw text (any entry such as "120/80").
+    The same inference is applied here, so resubmitted files keep their
+    existing ids and value_num still reads every number. Missing entries
+    stay null.
+
+    It runs per chunk, not per file: for a file larger than one CSV block
+    the result depends on where the blocks split. Such a file only renders
+    like pd.read_csv did when every block infers the file's type; a block
+    that is all integers in an otherwise float or text column differs.
+    """
+    text = pa.array(s, type=pa.string(), from_pandas=True)
+    if text.null_count == 0:
+        for int_type in (pa.int64(), pa.uint64()):
+            try:
+                return pc.cast(pc.cast(text, int_type), pa.string())
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                pass
+    try:
+        numbers = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+        # Integers Arrow's int cast rejects ("+5") are still ints to pandas
+        reparse = (text.null_count == 0 and np.isfinite(numbers).all()
+                   and (numbers == np.floor(numbers)).all()
+                   and not pc.any(pc.match_substring_regex(text, "[.eEnN]")).as_py())
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Arrow rejects text pandas still reads as a number (" 95")
+        reparse = True
+    if reparse:
+        try:
+            parsed = pd.to_numeric(s)
+        except (ValueError, TypeError):
+            return text
+        if pd.api.types.is_integer_dtype(parsed) and not parsed.hasnans:
+            return pa.array(parsed.astype(str), type=pa.string())
+        numbers = parsed.to_numpy(dtype=np.float64, na_value=np.nan)
+    # Arrow's shortest round-trip text matches Python's float str() wherever
+    # neither writes an exponent, bar the trailing ".0" on whole numbers;
+    # only the remaining rows are formatted one by one
+    out = pc.cast(pa.array(numbers), pa.string())
+    out = pc.if_else(pc.match_substring_regex(out, "[.n]"), out, pc.binary_join_element_wise(out, ".0", ""))
+    size = np.abs(numbers)
+    exact = ~np.isfinite(numbers) | (numbers == 0) | ((size >= 1e-4) & (size < 1e16))
+    exact &= ~pc.match_substring(out, "e").to_numpy(zero_copy_only=False)
+    if not exact.all():
+        slow = ~exact
+        out = pc.replace_with_mask(out, pa.array(slow), pa.array(map(str, numbers[slow].tolist()), type=pa.string()))
+    return pc.if_else(text.is_null(), pa.scalar(None, pa.string()), out)
+
+def transform_data(job_id: str, df: pd.DataFrame) -> Optional[pd.DataFrame]:
     """Clean & normalize the extracted DataFrame.
 
+    Column names and string fields arrive already normalized and trimmed
+    from the Arrow stage in `extract_file`.
+
     Steps:
-    1. Lower‑case and underscore column names
-    2. Parse `timestamp` to pandas datetime
-    3. Coerce numeric columns (`quality_score`)
-    4. Strip whitespace from string fields
-    5. Add `processed_at` & `job_id` metadata columns
+    1. Parse `timestamp` to pandas datetime (Arrow cast, pandas fallback)
+    2. Coerce numeric columns (`quality_score`) and render `value` as the
+       original pd.read_csv loader stored it
+    3. Make `measurement_type`, `unit` and `site_id` categorical
     """
     try:
-        # normalize column names
-        df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
-
-        # Parse timestamp to UTC
-        df['timestamp'] = df['timestamp'].apply(lambda t: parser.isoparse(t).astimezone(pytz.UTC))
+        # Parse timestamp to UTC, truncated to the microseconds TIMESTAMP holds
+        # (and dateutil's isoparse kept, so ids of such rows stay the same)
+        df['timestamp'] = _parse_timestamps(df['timestamp']).dt.floor('us')
+        # timestamp is NOT NULL: fail here rather than as a COPY error later
+        missing = int(df['timestamp'].isna().sum())
+        if missing:
+            raise ValueError(f"Missing timestamp in {missing} rows")
         # Coerce types
         # df['value'] = pd.to_numeric(df['value'], errors='coerce')
-        df['quality_score'] = pd.to_numeric(df['quality_score'], errors='coerce')
-        # Clamp quality_score
-        df['quality_score'] = df['quality_score'].clip(lower=0, upper=1)
-       # Strip strings
-        for col in ['study_id','participant_id','measurement_type','unit','site_id']:
-            if col in df:
-                df[col] = df[col].astype(str).str.strip()
-
-        # Metadata
-        df['processed_at'] = datetime.utcnow()
-        df['created_at'] = datetime.utcnow()
-        df['_jd_at'] = datetime.utcnow()
-        jobs[job_id]['progress'] = 30
-        jobs[job_id]['message'] = 'Data transformed'
+        df['value'] = pd.Series(pd.arrays.ArrowStringArray(_typed_value_text(df['value'])), index=df.index)
+        quality = _parse_numbers(df['quality_score'])
+        # Clamp quality_score on the raw ndarray (NaN passes through untouched);
+        # Postgres rounds it into DECIMAL(3,2) on COPY. Kept as float64: the
+        # CSV writer's shortest round-trip text then reproduces the input
+        # digits, which a float32 cannot hold past ~7 significant figures
+        np.clip(quality, 0.0, 1.0, out=quality)
+        df['quality_score'] = quality
+        # Low-cardinality columns: integer codes over their distinct values
+        # (already categorical when the frame comes from extract_file)
+        for col in df.columns.intersection(list(CATEGORY_COLUMNS)):
+            if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+
+        # processed_at / created_at are left to the column DEFAULTs in Postgres
+        jobs.update(job_id, message='Data transformed')
         logger.info(f"Job {job_id}: transformed {len(df)} rows")
         return df
     except Exception as e:
-        jobs[job_id]['status'] = 'failed'
-        jobs[job_id]['message'] = f'Transform error: {e}'
+        jobs.update(job_id, status='failed', message=f'Transform error: {e}')
         logger.exception(f"Job {job_id}: transform failed")
         return None
 
 # python level validation logic
-VALID_MEASUREMENTS = {"glucose", "cholesterol", "weight", "height", "blood_pressure", "heart_rate"}
+VALID_MEASUREMENTS = frozenset({"glucose", "cholesterol", "weight", "height", "blood_pressure", "heart_rate"})
 
+VALIDATE_VALUE_RANGES = bool(os.getenv("VALIDATE_VALUE_RANGES"))
 RANGE_LIMITS = {
     "glucose": (70, 200),
     "cholesterol": (100, 300),
@@ -117,282 +417,548 @@ RANGE_LIMITS = {
     "heart_rate": (60, 100)
 }
 
-async def validate_data(job_id: str, df: pd.DataFrame) -> bool:
+def validate_data(job_id: str, df: pd.DataFrame) -> bool:
     errors = []
     # Required columns
     for col in ['study_id','participant_id','measurement_type','value','timestamp']:
         if col not in df.columns:
             errors.append(f"Missing column {col}")
     # Valid measurement types
-    bad_types = df[~df['measurement_type'].isin(VALID_MEASUREMENTS)]
-    if not bad_types.empty:
-        errors.append(f"Invalid types: {bad_types['measurement_type'].unique().tolist()}")
-    # Value range checks for numeric types
-    # for m,(low,high) in RANGE_LIMITS.items():
-    #     if m in df['measurement_type'].values:
-    #         subset = df[df['measurement_type']==m]
-    #         if subset['value'].dropna().between(low,high).all() is False:
-    #             errors.append(f"Out-of-range values for {m}")
+    # measurement_type is categorical after transform_data, so only the handful
+    # of distinct categories need a string compare; rows are checked via codes
+    mt = df['measurement_type']
+    if not isinstance(mt.dtype, pd.CategoricalDtype):
+        mt = mt.astype('category')
+    categories = mt.cat.categories
+    bad_types = categories[~categories.isin(VALID_MEASUREMENTS)].tolist()
+    if (mt.cat.codes == -1).any():
+        bad_types.append(np.nan)
+    if bad_types:
+        errors.append(f"Invalid types: {bad_types}")
+    # Value range checks for numeric types (opt-in). Limits are looked up per
+    # category and broadcast through the codes, so the value column is scanned
+    # once; non-numeric readings such as '120/80' coerce to NaN and pass
+    if VALIDATE_VALUE_RANGES:
+        limits = np.array([RANGE_LIMITS.get(c, (np.nan, np.nan)) for c in categories]
+                          + [(np.nan, np.nan)], dtype=np.float64)
+        codes = mt.cat.codes.to_numpy()
+        low, high = limits[codes, 0], limits[codes, 1]
+        value = _parse_numbers(df['value'])
+        out_of_range = (value < low) | (value > high)
+        for m in categories[np.unique(codes[out_of_range])]:
+            errors.append(f"Out-of-range values for {m}")
     if errors:
-        jobs[job_id]['status']='failed'
-        jobs[job_id]['message']='; '.join(errors)
+        jobs.update(job_id, status='failed', message='; '.join(errors))
         logger.error(f"Job {job_id}: validation errors {errors}")
         return False
-    jobs[job_id]['progress']=50
-    jobs[job_id]['message']='Validation passed'
+    jobs.update(job_id, message='Validation passed')
     return True
 
-def load_data(job_id: str, df: pd.DataFrame):
-    database_url = os.getenv('DATABASE_URL')
-    if database_url:
-        conn = psycopg2.connect(database_url)
-    cur = conn.cursor()
+# Column order of the COPY payload; projected from `df` one chunk at a
+# time so no full copy of the frame is materialized first.
+COPY_COLUMNS = ['id', 'study_id', 'participant_id', 'measurement_type', 'value', 'unit',
+                'timestamp', 'site_id', 'quality_score']
+COPY_SQL = f"COPY clinical_measurements({', '.join(COPY_COLUMNS)}) FROM STDIN WITH CSV"
+COPY_CHUNK_ROWS = 50_000
+# Bytes per CopyData message; psycopg2's 8 KiB default means ~128 reads and
+# protocol messages per MiB of payload
+COPY_READ_SIZE = 256 << 10
 
-    # Add deterministic UUIDs
-    if 'id' not in df.columns:
-        df.insert(
-            0, 'id',
-            df.apply(make_deterministic_id, axis=1)
-        )
+COPY_WRITE_OPTIONS = pacsv.WriteOptions(include_header=False)
 
+def _copy_table(df: pd.DataFrame) -> pa.Table:
+    """
+    Project `df` onto COPY_COLUMNS as an Arrow table for Arrow's CSV writer.
 
-    # Upsert studies
-    for s in df['study_id'].unique():
-        cur.execute("INSERT INTO studies(study_id) VALUES (%s) ON CONFLICT DO NOTHING", (s,))
-
-    # Upsert participants
-    for pid in df['participant_id'].unique():
-        cur.execute("""
-            INSERT INTO participants (participant_id)
-            VALUES (%s)
-            ON CONFLICT DO NOTHING
-        """, (pid,))
-
-    #  Upsert participant enrollments
-    for (pid, sid), grp in df.groupby(['participant_id', 'study_id']):
-        first_seen = grp['timestamp'].min()        # pandas Timestamp
-        cur.execute("""
-            INSERT INTO participant_enrollments (participant_id, study_id, enrolled_at)
-            VALUES (%s, %s, %s)
-            ON CONFLICT (participant_id, study_id) DO UPDATE
-                SET enrolled_at =
-                    LEAST(participant_enrollments.enrolled_at, EXCLUDED.enrolled_at)
-        """, (pid, sid, first_seen.to_pydatetime()))
-
-
-    # Upsert sites
-    for site in df['site_id'].unique():
-        cur.execute("INSERT INTO sites(site_id) VALUES (%s) ON CONFLICT DO NOTHING", (site,))
-
-    # Bulk insert into clinical_measurements
-    buf = io.StringIO()
-    df_to_copy = df[['id','study_id','participant_id','measurement_type','value','unit','timestamp','site_id','quality_score','processed_at','created_at']]
-    df_to_copy.to_csv(buf, index=False, header=False)
-    buf.seek(0)
-    cur.copy_expert(
-        "COPY clinical_measurements(id, study_id,participant_id,measurement_type,value,unit,timestamp,site_id,quality_score,processed_at,created_at) FROM STDIN WITH CSV",
-        buf
-    )
+    Arrow-backed strings and categoricals convert without a copy of their
+    text; datetimes become naive UTC wall time at microsecond precision,
+    which is what the TIMESTAMP columns store. Nulls are written as empty
+    unquoted fields (NULL), strings are always quoted.
+    """
+    arrays = []
+    for col in COPY_COLUMNS:
+        arr = pa.array(df[col], from_pandas=True)
+        if pa.types.is_timestamp(arr.type):
+            arr = pc.cast(arr, pa.timestamp("us"), safe=False)
+        arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=COPY_COLUMNS)
+
+def copy_dataframe(cur, df: pd.DataFrame, chunk_rows: int = COPY_CHUNK_ROWS) -> None:
+    """
+    Stream `df` into clinical_measurements through an OS pipe.
 
-    conn.commit()
-    inserted_ids = df['id'].tolist()
-    upsert_measurement_aggs(inserted_ids)
-    cur.close()
-    conn.close()
+    A writer thread renders the CSV `chunk_rows` rows at a time with
+    Arrow's CSV writer while COPY reads the other end, so peak memory is
+    one chunk of text rather than the whole file. Writer errors are re-raised before the caller
+    commits, so a truncated stream never gets committed.
+    """
+    read_fd, write_fd = os.pipe()
+    errors: list[BaseException] = []
+
+    def _write():
+        try:
+            with os.fdopen(write_fd, "wb") as w:
+                for start in range(0, len(df), chunk_rows):
+                    table = _copy_table(df.iloc[start:start + chunk_rows])
+                    pacsv.write_csv(table, w, write_options=COPY_WRITE_OPTIONS)
+        except BaseException as exc:
+            errors.append(exc)
+
+    writer = threading.Thread(target=_write, daemon=True)
+    writer.start()
+    try:
+        with os.fdopen(read_fd, "rb") as r:
+            cur.copy_expert(COPY_SQL, r, size=COPY_READ_SIZE)
+    finally:
+        writer.join()
+    if errors:
+        raise errors[0]
+
+# Dimension upserts: the distinct keys of a chunk go in as one array parameter
+INSERT_STUDIES_SQL = "INSERT INTO studies(study_id) SELECT unnest(%s::text[]) ON CONFLICT DO NOTHING"
+INSERT_PARTICIPANTS_SQL = "INSERT INTO participants(participant_id) SELECT unnest(%s::text[]) ON CONFLICT DO NOTHING"
+INSERT_SITES_SQL = "INSERT INTO sites(site_id) SELECT unnest(%s::text[]) ON CONFLICT DO NOTHING"
+UPSERT_ENROLLMENTS_SQL = """
+    INSERT INTO participant_enrollments (participant_id, study_id, enrolled_at)
+    SELECT * FROM unnest(%s::text[], %s::text[], %s::timestamp[])
+    ON CONFLICT (participant_id, study_id) DO UPDATE
+        SET enrolled_at =
+            LEAST(participant_enrollments.enrolled_at, EXCLUDED.enrolled_at)
+"""
+# psycopg2 has no pipeline mode, but it sends a query string as one simple
+# Query message, so all four upserts share a single round-trip
+UPSERT_DIMENSIONS_SQL = ";\n".join([
+    INSERT_STUDIES_SQL, INSERT_PARTICIPANTS_SQL, INSERT_SITES_SQL, UPSERT_ENROLLMENTS_SQL,
+])
+
+def load_data(conn, job_id: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Write one transformed chunk through `conn` without committing, so the
+    caller can commit all chunks of a file as a single transaction.
 
-    jobs[job_id]['progress'] = 90
-    jobs[job_id]['message'] = 'Loaded into DB'
+    Returns the chunk's daily bucket partials; the caller passes those of
+    all chunks to `load_aggregates` once before committing.
+    """
+    # Add deterministic UUIDs
+    if 'id' not in df.columns:
+        df.insert(0, 'id', make_deterministic_ids(df))
+
+    with conn.cursor() as cur:
+        # One unsorted groupby-min gives the first-seen timestamp per
+        # (participant, study); the distinct studies and participants are
+        # then read off those pairs rather than rescanning both columns
+        enroll = df.groupby(['participant_id', 'study_id'], sort=False, observed=True)['timestamp'].min().reset_index()
+
+        # Upsert dimensions, then enrollments (timestamps as naive UTC, like
+        # the COPY payload, in three parallel arrays), in one round-trip
+        cur.execute(UPSERT_DIMENSIONS_SQL, (
+            enroll['study_id'].unique().tolist(),
+            enroll['participant_id'].unique().tolist(),
+            df['site_id'].dropna().unique().tolist(),
+            enroll['participant_id'].tolist(),
+            enroll['study_id'].tolist(),
+            enroll['timestamp'].dt.tz_convert(None).tolist(),
+        ))
+
+        # Bulk insert into clinical_measurements
+        copy_dataframe(cur, df)
+
+    jobs.update(job_id, message='Loaded into DB')
     logger.info(f"Job {job_id}: loaded {len(df)} rows into database")
+    return _daily_partials(df)
+
+def load_aggregates(conn, partials: list[pd.DataFrame]):
+    """Merge the buckets of every loaded chunk into measurement_aggregations, uncommitted."""
+    with conn.cursor() as cur:
+        upsert_measurement_aggs(cur, partials)
+
+# Single fixed statement for every status shape: NULL progress/message keep
+# the stored value, and completed_at is only stamped on completion.
+UPDATE_JOB_STATUS_SQL = """
+    UPDATE etl_jobs
+    SET status       = %(status)s,
+        updated_at   = %(now)s,
+        completed_at = CASE WHEN %(status)s = 'completed' THEN %(now)s ELSE completed_at END,
+        progress     = COALESCE(%(progress)s, progress),
+        message      = COALESCE(%(message)s, message)
+    WHERE id = %(job_id)s
+"""
 
 def update_etl_job_status(job_id: str, status: str, progress: int = None, message: str = None):
-    database_url = os.getenv('DATABASE_URL')
-    if database_url:
-        conn = psycopg2.connect(database_url)
-    
-    cur = conn.cursor()
+    params = {
+        "status": status,
+        "now": datetime.utcnow(),
+        "progress": progress,
+        "message": message,
+        "job_id": job_id,
+    }
+    with get_db_connection() as conn, conn.cursor() as cur:
+        cur.execute(UPDATE_JOB_STATUS_SQL, params)
+        conn.commit()
     
-    now = datetime.utcnow()
-    set_clauses = ["status = %s", "updated_at = %s"]
-    values = [status, now]
-
-    if status == 'completed':
-        set_clauses.append("completed_at = %s")
-        values.append(now)
-
-    if progress is not None:
-        set_clauses.append("progress = %s")
-        values.append(progress)
+    logger.info(f"Updated database status for job {job_id}: {status}")
 
-    if message is not None:
-        set_clauses.append("message = %s")
-        values.append(message)
+SELECT_JOB_SQL = """
+    SELECT filename, study_id, status, progress, message
+    FROM etl_jobs
+    WHERE id = %s
+"""
 
-    query = f"""
-        UPDATE etl_jobs 
-        SET {', '.join(set_clauses)}
-        WHERE id = %s
+def fetch_etl_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Read a job back from etl_jobs, for jobs no longer (or never) held in
+    this process's JobStore, e.g. evicted after finishing.
     """
-    values.append(job_id)
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        return None  # etl_jobs.id is a UUID; anything else cannot match
+    if not DATABASE_URL:
+        return None
+    try:
+        with get_db_connection() as conn, conn.cursor() as cur:
+            cur.execute(SELECT_JOB_SQL, (job_id,))
+            row = cur.fetchone()
+            conn.rollback()  # read-only; end the transaction before returning the connection
+    except (OperationalError, PoolError) as exc:
+        logger.warning(f"Could not read job {job_id} from database: {exc}")
+        return None
+    if row is None:
+        return None
+    filename, study_id, status, progress, message = row
+    return {
+        "jobId": job_id,
+        "filename": filename,
+        "studyId": study_id,
+        "status": status,
+        "progress": progress,
+        "message": message,
+    }
 
-    cur.execute(query, values)
-    conn.commit()
-    cur.close()
-    conn.close()
-    
-    logger.info(f"Updated database status for job {job_id}: {status}")
+async def find_job(job_id: str) -> Dict[str, Any]:
+    job = jobs.get(job_id)
+    if job is None:
+        job = await asyncio.to_thread(fetch_etl_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# Same patterns as the value_num / bp_* generated columns in schema.sql
+NUMERIC_VALUE_PATTERN = r'[0-9]+(?:\.[0-9]+)?'
+BP_VALUE_PATTERN = r'([0-9]+)/([0-9]+)'
+AGG_KEY_COLUMNS = ['agg_day', 'study_id', 'site_id', 'participant_id', 'measurement_type']
+# Buckets per INSERT statement; execute_values' default of 100 means one
+# round-trip per 100 buckets. Keys are unique within a file, so a larger
+# page never makes ON CONFLICT touch the same row twice
+AGG_PAGE_SIZE = 10_000
+
+def _round_like_numeric(s: pd.Series, scale: int) -> np.ndarray:
+    """
+    Round `s` the way Postgres rounds its COPY text into NUMERIC(_, scale):
+    half away from zero on the decimal digits, not numpy's half-to-even on
+    the binary float (0.985 -> 0.99, where np.round gives 0.98).
 
-def upsert_measurement_aggs(inserted_ids: list[str]) -> None:
+    Rounding the float64 agrees with rounding its decimal text except close
+    to an exact half, where the binary error can fall either side; those
+    few values are rounded from the text the CSV writer emits, with Decimal.
     """
-    Collapse the freshly-inserted clinical_measurements rows (identified
-    by their UUIDs) into daily buckets and merge them into the
-    measurement_aggregations table.
+    x = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    factor = 10.0 ** scale
+    scaled = np.abs(x) * factor
+    out = np.sign(x) * np.floor(scaled + 0.5) / factor
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_half.any():
+        quantum = Decimal(1).scaleb(-scale)
+        text = pc.cast(pa.array(x[near_half]), pa.string()).to_pylist()
+        out[near_half] = [float(Decimal(t).quantize(quantum, rounding=ROUND_HALF_UP)) for t in text]
+    return out
+
+# Per-bucket sums and non-NULL counts; unlike averages these add up across
+# chunks, so a bucket split over two CSV blocks aggregates as one
+_PARTIAL_SUMS = {
+    'value_num': ('value_sum', 'value_count'),
+    'bp_systolic': ('systolic_sum', 'systolic_count'),
+    'bp_diastolic': ('diastolic_sum', 'diastolic_count'),
+    'quality_score': ('quality_sum', 'quality_count'),
+}
 
-    Call immediately after COPY + commit:
-        inserted_ids = df['id'].tolist()
-        upsert_measurement_aggs(inserted_ids)
+def _daily_partials(df: pd.DataFrame) -> pd.DataFrame:
     """
-    if not inserted_ids:       # nothing new
+    Bucket one loaded chunk by day/study/site/participant/type in pandas,
+    as sums, non-NULL counts and extrema of what the generated columns
+    would hold for the same rows. `_merge_daily_partials` turns the
+    partials of every chunk of a file into the SQL aggregates.
+    """
+    # Postgres trim() strips spaces only
+    value = df['value'].str.strip(' ')
+    is_num = value.str.fullmatch(NUMERIC_VALUE_PATTERN, na=False)
+    bp = value.str.fullmatch(BP_VALUE_PATTERN, na=False)
+    bp_parts = value.where(bp).str.split('/', n=1, expand=True).reindex(columns=[0, 1])
+    # Compare against what DECIMAL(3,2) holds, not the unrounded float
+    quality = pd.Series(_round_like_numeric(df['quality_score'], 2), index=df.index)
+    frame = pd.DataFrame({
+        'agg_day': df['timestamp'].dt.tz_convert(None).dt.normalize(),
+        'study_id': df['study_id'],
+        'site_id': df['site_id'],
+        'participant_id': df['participant_id'],
+        'measurement_type': df['measurement_type'],
+        'value_num': pd.to_numeric(value.where(is_num)),
+        'bp_systolic': pd.to_numeric(bp_parts[0]),
+        'bp_diastolic': pd.to_numeric(bp_parts[1]),
+        'quality_score': quality,
+        'low_quality': (quality < 0.95).astype(np.int64),
+    })
+    named = {'measurement_count': ('value_num', 'size'),
+             'min_value': ('value_num', 'min'),
+             'max_value': ('value_num', 'max'),
+             'low_quality_count': ('low_quality', 'sum')}
+    for col, (total, count) in _PARTIAL_SUMS.items():
+        named[total] = (col, 'sum')
+        named[count] = (col, 'count')
+    return frame.groupby(AGG_KEY_COLUMNS, sort=False, observed=True).agg(**named).reset_index()
+
+def _merge_daily_partials(partials: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Combine per-chunk partials into one row per bucket with the columns of
+    measurement_aggregations: NULL-skipping averages, and NULL
+    low_quality_count when a bucket has no quality scores, as the SQL
+    aggregates over the same rows would give.
+    """
+    frame = pd.concat(partials, ignore_index=True) if len(partials) > 1 else partials[0]
+    how = {'measurement_count': 'sum', 'min_value': 'min', 'max_value': 'max', 'low_quality_count': 'sum'}
+    for total, count in _PARTIAL_SUMS.values():
+        how[total] = how[count] = 'sum'
+    merged = frame.groupby(AGG_KEY_COLUMNS, sort=False, observed=True).agg(how).reset_index()
+    agg = merged[AGG_KEY_COLUMNS + ['measurement_count']].copy()
+    agg['agg_day'] = agg['agg_day'].dt.date
+    for name, (total, count) in zip(['avg_value', 'avg_systolic', 'avg_diastolic', 'avg_quality_score'],
+                                    _PARTIAL_SUMS.values()):
+        agg[name] = merged[total] / merged[count].where(merged[count] > 0)
+    agg['min_value'] = merged['min_value']
+    agg['max_value'] = merged['max_value']
+    agg['low_quality_count'] = merged['low_quality_count'].where(merged['quality_count'] > 0).astype('Int64')
+    return agg[AGG_KEY_COLUMNS + ['measurement_count', 'avg_value', 'min_value', 'max_value',
+                                  'avg_systolic', 'avg_diastolic', 'avg_quality_score', 'low_quality_count']]
+
+def upsert_measurement_aggs(cur, partials: list[pd.DataFrame]) -> None:
+    """
+    Collapse a file's freshly loaded rows into daily buckets and merge them
+    into the measurement_aggregations table.
+
+    Each chunk's buckets come from `_daily_partials` on the frame that was
+    just COPYed, so the fresh rows are not read back from
+    clinical_measurements. Call once per file, after the last chunk and on
+    the same cursor/transaction as the COPY:
+        upsert_measurement_aggs(cur, partials)
+    """
+    if not partials:       # nothing new
         return
 
-    conn = psycopg2.connect(os.getenv("DATABASE_URL"))
-    with conn, conn.cursor() as cur:
-        # 1️⃣  collapse only the fresh rows
-        cur.execute(
-            """
-            WITH src AS (
-                SELECT *
-                FROM   clinical_measurements
-                WHERE  id = ANY(%s::uuid[])
-            ), agg AS (
-                SELECT
-                    DATE_TRUNC('day', "timestamp")::date   AS agg_day,
-                    study_id, site_id, participant_id, measurement_type,
-                    COUNT(*)                              AS measurement_count,
-                    AVG(value_num)                        AS avg_value,
-                    MIN(value_num)                        AS min_value,
-                    MAX(value_num)                        AS max_value,
-                    AVG(bp_systolic)                      AS avg_systolic,
-                    AVG(bp_diastolic)                     AS avg_diastolic,
-                    AVG(quality_score)                    AS avg_quality_score,
-                    SUM((quality_score < 0.95)::INT)       AS low_quality_count
-                FROM src
-                GROUP BY 1,2,3,4,5
-            )
-            SELECT * FROM agg;
-            """,
-            (inserted_ids,),
-        )
-        rows = cur.fetchall()
-        if not rows:
-            return
-
-        # 2️⃣  merge into measurement_aggregations
-        execute_values(
-            cur,
-            """
-            INSERT INTO measurement_aggregations (
-                agg_day, study_id, site_id, participant_id, measurement_type,
-                measurement_count, avg_value, min_value, max_value,
-                avg_systolic, avg_diastolic,
-                avg_quality_score, low_quality_count
-            )
-            VALUES %s
-            ON CONFLICT (agg_day, study_id, site_id, participant_id, measurement_type)
-            DO UPDATE SET
-              measurement_count  = measurement_aggregations.measurement_count
-                                   + EXCLUDED.measurement_count,
-              min_value          = LEAST(measurement_aggregations.min_value,
-                                         EXCLUDED.min_value),
-              max_value          = GREATEST(measurement_aggregations.max_value,
-                                           EXCLUDED.max_value),
-              low_quality_count  = measurement_aggregations.low_quality_count
-                                   + EXCLUDED.low_quality_count,
-              avg_value          = (
-                  measurement_aggregations.avg_value * measurement_aggregations.measurement_count
-                + EXCLUDED.avg_value * EXCLUDED.measurement_count
-              ) / (measurement_aggregations.measurement_count + EXCLUDED.measurement_count),
-              avg_systolic       = COALESCE(
-                  (measurement_aggregations.avg_systolic * measurement_aggregations.measurement_count
-                 + EXCLUDED.avg_systolic * EXCLUDED.measurement_count)
-                  / NULLIF(measurement_aggregations.measurement_count + EXCLUDED.measurement_count,0),
-                  measurement_aggregations.avg_systolic),
-              avg_diastolic      = COALESCE(
-                  (measurement_aggregations.avg_diastolic * measurement_aggregations.measurement_count
-                 + EXCLUDED.avg_diastolic * EXCLUDED.measurement_count)
-                  / NULLIF(measurement_aggregations.measurement_count + EXCLUDED.measurement_count,0),
-                  measurement_aggregations.avg_diastolic),
-              avg_quality_score  = (
-                  measurement_aggregations.avg_quality_score * measurement_aggregations.measurement_count
-                + EXCLUDED.avg_quality_score * EXCLUDED.measurement_count
-              ) / (measurement_aggregations.measurement_count + EXCLUDED.measurement_count);
-            """,
-            rows,
+    # 1️⃣  collapse only the fresh rows
+    agg = _merge_daily_partials(partials)
+    # NaN → NULL, numpy scalars → Python objects psycopg2 can adapt
+    rows = list(agg.astype(object).where(agg.notna(), None).itertuples(index=False, name=None))
+
+    # 2️⃣  merge into measurement_aggregations
+    execute_values(
+        cur,
+        """
+        INSERT INTO measurement_aggregations (
+            agg_day, study_id, site_id, participant_id, measurement_type,
+            measurement_count, avg_value, min_value, max_value,
+            avg_systolic, avg_diastolic,
+            avg_quality_score, low_quality_count
         )
+        VALUES %s
+        ON CONFLICT (agg_day, study_id, site_id, participant_id, measurement_type)
+        DO UPDATE SET
+          measurement_count  = measurement_aggregations.measurement_count
+                               + EXCLUDED.measurement_count,
+          min_value          = LEAST(measurement_aggregations.min_value,
+                                     EXCLUDED.min_value),
+          max_value          = GREATEST(measurement_aggregations.max_value,
+                                       EXCLUDED.max_value),
+          low_quality_count  = measurement_aggregations.low_quality_count
+                               + EXCLUDED.low_quality_count,
+          avg_value          = (
+              measurement_aggregations.avg_value * measurement_aggregations.measurement_count
+            + EXCLUDED.avg_value * EXCLUDED.measurement_count
+          ) / (measurement_aggregations.measurement_count + EXCLUDED.measurement_count),
+          avg_systolic       = COALESCE(
+              (measurement_aggregations.avg_systolic * measurement_aggregations.measurement_count
+             + EXCLUDED.avg_systolic * EXCLUDED.measurement_count)
+              / NULLIF(measurement_aggregations.measurement_count + EXCLUDED.measurement_count,0),
+              measurement_aggregations.avg_systolic),
+          avg_diastolic      = COALESCE(
+              (measurement_aggregations.avg_diastolic * measurement_aggregations.measurement_count
+             + EXCLUDED.avg_diastolic * EXCLUDED.measurement_count)
+              / NULLIF(measurement_aggregations.measurement_count + EXCLUDED.measurement_count,0),
+              measurement_aggregations.avg_diastolic),
+          avg_quality_score  = (
+              measurement_aggregations.avg_quality_score * measurement_aggregations.measurement_count
+            + EXCLUDED.avg_quality_score * EXCLUDED.measurement_count
+          ) / (measurement_aggregations.measurement_count + EXCLUDED.measurement_count);
+        """,
+        rows,
+        page_size=AGG_PAGE_SIZE,
+    )
 
-def make_deterministic_id(row) -> str:
+ID_KEY_COLUMNS = ('study_id', 'participant_id', 'timestamp', 'measurement_type', 'value')
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+# Byte offsets of the 32 hex digits within the 36-char dashed UUID text
+_UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+def _timestamp_key_text(s: pd.Series) -> pa.Array:
     """
-    Build a v3-style UUID (MD5 namespace) from the unique content
-    of a clinical measurement row.
+    Render a UTC datetime column exactly as `Series.astype(str)` does
+    ("2024-01-15 09:30:00+00:00", with ".ffffff" or ".fffffffff" only when
+    there is a fraction) using numpy/Arrow kernels instead of one Timestamp
+    object per row.
     """
-    key = "|".join(
-        str(row[col]) for col in (
-            'study_id', 'participant_id', 'timestamp',
-            'measurement_type', 'value'
-        )
-    )
-    # MD5 hash → UUID object → str
-    return str(uuid.UUID(hashlib.md5(key.encode("utf-8")).hexdigest()))
+    if s.dt.tz is None or str(s.dt.tz) != "UTC":
+        return pa.array(s.astype(str), type=pa.string())
+    naive = s.dt.tz_convert(None).to_numpy(dtype="datetime64[ns]")
+    seconds = np.datetime_as_string(naive.astype("datetime64[s]"), unit="s")
+    base = pc.replace_substring(pa.array(seconds), "T", " ", max_replacements=1)
+    ns = naive.view(np.int64) % 1_000_000_000
+    digits = pc.utf8_lpad(pc.cast(pa.array(ns), pa.string()), 9, "0")
+    frac = pc.if_else(pa.array(ns % 1000 == 0), pc.utf8_slice_codeunits(digits, 0, 6), digits)
+    frac = pc.if_else(pa.array(ns == 0), "", pc.binary_join_element_wise(".", frac, ""))
+    return pc.binary_join_element_wise(base, frac, "+00:00", "")
+
+def make_deterministic_ids(df: pd.DataFrame) -> pd.Series:
+    """
+    Build v3-style UUIDs (MD5 namespace) from the unique content
+    of each clinical measurement row.
+
+    The "|"-joined keys (same text as joining each column's astype(str))
+    are built with Arrow's element-wise join, so only the MD5 itself runs
+    per row. The digests are hex-formatted in one numpy pass into a single
+    buffer that backs a string[pyarrow] column, without a str per id.
+    """
+    parts = []
+    for col in ID_KEY_COLUMNS:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            parts.append(_timestamp_key_text(df[col]))
+        elif col == 'value':
+            # Already rendered by transform_data; original keys had NaN as "nan"
+            parts.append(pc.fill_null(pa.array(df[col], type=pa.string(), from_pandas=True), "nan"))
+        else:
+            parts.append(pc.cast(pa.array(df[col], from_pandas=True), pa.string()))
+    keys = pc.binary_join_element_wise(*parts, "|", null_handling="replace", null_replacement="None")
+    md5 = hashlib.md5
+    digests = b"".join([md5(k).digest() for k in keys.cast(pa.binary()).to_pylist()])
+    raw = np.frombuffer(digests, dtype=np.uint8).reshape(-1, 16)
+    n = len(raw)
+    text = np.full((n, 36), ord("-"), dtype=np.uint8)
+    text[:, _UUID_HEX_POSITIONS[0::2]] = _HEX_DIGITS[raw >> 4]
+    text[:, _UUID_HEX_POSITIONS[1::2]] = _HEX_DIGITS[raw & 0x0F]
+    offsets = np.arange(0, 36 * (n + 1), 36, dtype=np.int32)
+    ids = pa.StringArray.from_buffers(n, pa.py_buffer(offsets), pa.py_buffer(text))
+    return pd.Series(pd.arrays.ArrowStringArray(ids), index=df.index, name="id")
+
+# Jobs beyond ETL_MAX_CONCURRENT_JOBS wait here instead of failing on getconn()
+job_slots = asyncio.Semaphore(ETL_MAX_CONCURRENT_JOBS)
 
 async def process_etl_job(job_id: str, filename: str, study_id: Optional[str] = None):
     """
     Process an ETL job: extract, transform, validate, and load data.
-    Background task - does not return HTTP responses.
+    Background task - does not return HTTP responses. Parsing, pandas and
+    database work run in worker threads so the event loop keeps serving
+    status requests while a job is loading.
+
+    The file is streamed chunk by chunk so memory stays bounded by one CSV
+    block. All chunks are loaded on one connection and committed together,
+    so a chunk that fails validation late in the file leaves nothing behind.
     """
-    
-    # 1. File extraction
-    df = await extract_file(job_id, filename)
-    if df is None:  
+    async with job_slots:
+        await run_etl_job(job_id, filename, study_id)
+
+async def run_etl_job(job_id: str, filename: str, study_id: Optional[str] = None):
+    # 1. File extraction (open_csv reads and parses the first block up front)
+    chunks = await asyncio.to_thread(extract_file, job_id, filename)
+    if chunks is None:  
         # Update database status to failed
-        update_etl_job_status(job_id, "failed", message=jobs[job_id]["message"])                                  
+        await asyncio.to_thread(update_etl_job_status, job_id, "failed", message=jobs.get(job_id)["message"])
         return
-    if os.getenv('DEVELOPMENT'):
+    if DEVELOPMENT:
         await asyncio.sleep(10)  # Small delay for demonstration
-    # 2. Data transformation 
-    df = await transform_data(job_id, df)
-    if df is None:
-        # Update database status to failed
-        update_etl_job_status(job_id, "failed", message=jobs[job_id]["message"])
-        return
-    if os.getenv('DEVELOPMENT'):
-        await asyncio.sleep(10)
-        
-    # 3. Quality validation
-    ok = await validate_data(job_id, df)
-    if not ok: 
-        update_etl_job_status(job_id, "failed", message=jobs[job_id]["message"])
-        return
-    if os.getenv('DEVELOPMENT'):
-        await asyncio.sleep(10)
 
-    # 4. Database loading
+    file_size = max(os.path.getsize(f"/data/{filename}"), 1)
+    rows_done = 0
+    partials = []
+    failed = False
+    # Set before each call, so an error is reported against the stage that raised it
+    stage = "Load"
     try:
-        load_data(job_id, df)
+        async with get_async_db_connection() as conn:
+            blocks = 0
+            # The DEVELOPMENT demo delays run once per stage (first chunk
+            # only), as they did before the file was streamed in chunks
+            # Reading a block is blocking file I/O + parsing: keep it off the loop
+            while True:
+                stage = "Extraction"
+                if (df := await asyncio.to_thread(next, chunks, None)) is None:
+                    break
+                blocks += 1
+                # 2. Data transformation (CPU-bound pandas work, also off the loop)
+                stage = "Transform"
+                df = await asyncio.to_thread(transform_data, job_id, df)
+                if df is None:
+                    failed = True
+                    break
+                if DEVELOPMENT and blocks == 1:
+                    await asyncio.sleep(10)
+
+                # 3. Quality validation
+                stage = "Validation"
+                ok = await asyncio.to_thread(validate_data, job_id, df)
+                if not ok: 
+                    failed = True
+                    break
+                if DEVELOPMENT and blocks == 1:
+                    await asyncio.sleep(10)
+
+                # 4. Database loading (uncommitted until the last chunk)
+                stage = "Load"
+                partials.append(await asyncio.to_thread(load_data, conn, job_id, df))
+                rows_done += len(df)
+                # Blocks are ~CSV_BLOCK_SIZE bytes each, which gives a cheap
+                # estimate of how far through the file we are
+                done = min(1.0, blocks * CSV_BLOCK_SIZE / file_size)
+                jobs.update(job_id, progress=10 + int(80 * done), message=f"Loaded {rows_done} rows")
+                if DEVELOPMENT and blocks == 1:
+                    await asyncio.sleep(10)
+
+            stage = "Load"
+            if failed:
+                await asyncio.to_thread(conn.rollback)
+            else:
+                # Buckets are merged across chunks first, so one split by a
+                # block boundary is upserted once, like a single-chunk file
+                await asyncio.to_thread(load_aggregates, conn, partials)
+                await asyncio.to_thread(conn.commit)
     except Exception as e:
-        jobs[job_id]['status']='failed'
-        jobs[job_id]['message']=f"Load error: {e}"
-        update_etl_job_status(job_id, "failed", message=jobs[job_id]["message"])
-        logger.exception(f"Job {job_id}: load failed")
+        jobs.update(job_id, status='failed', message=f"{stage} error: {e}")
+        await asyncio.to_thread(update_etl_job_status, job_id, "failed", message=jobs.get(job_id)["message"])
+        logger.exception(f"Job {job_id}: {stage.lower()} failed")
+        return
+    finally:
+        # Unmaps the file now, also when a failed chunk ended the loop early
+        chunks.close()
+
+    if failed:
+        # Written after the load connection is back in the pool, so this
+        # never needs a second connection while holding the first
+        await asyncio.to_thread(update_etl_job_status, job_id, "failed", message=jobs.get(job_id)["message"])
         return
-    if os.getenv('DEVELOPMENT'):
-        await asyncio.sleep(10)
         
     # Finish
-    jobs[job_id]['status']='completed'
-    jobs[job_id]['progress']=100
-    jobs[job_id]['message']='Job completed successfully'
+    jobs.update(job_id, status='completed', progress=100, message='Job completed successfully')
     # IMPORTANT: Update database status to completed
-    update_etl_job_status(job_id, "completed", progress=100, message="Job completed successfully")
-    logger.info(f"Job {job_id}: completed successfully")
+    await asyncio.to_thread(update_etl_job_status, job_id, "completed", progress=100, message="Job completed successfully")
+    logger.info(f"Job {job_id}: completed successfully ({rows_done} rows)")
 
 @app.post("/jobs", response_model=ETLJobResponse)
 async def submit_job(job_request: ETLJobRequest, background_tasks: BackgroundTasks):
@@ -402,14 +968,14 @@ async def submit_job(job_request: ETLJobRequest, background_tasks: BackgroundTas
     job_id = job_request.jobId
     
     # Store job in memory (simplified for demo)
-    jobs[job_id] = {
+    jobs.create(job_id, {
         "jobId": job_id,
         "filename": job_request.filename,
         "studyId": job_request.studyId,
         "status": "running",
         "progress": 0,
         "message": "Job started"
-    }
+    })
     
     # Start ETL processing in background
     background_tasks.add_task(process_etl_job, job_id, job_request.filename, job_request.studyId)
@@ -422,10 +988,8 @@ async def get_job_status(job_id: str):
     """
     Get the current status of an ETL job
     """
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await find_job(job_id)
     
-    job = jobs[job_id]
     return ETLJobStatus(
         jobId=job_id,
         status=job["status"],
@@ -438,15 +1002,16 @@ async def get_job_details(job_id: str):
     """
     Get detailed information about an ETL job
     """
-    if job_id not in jobs:
-        raise HTTPException(status_code=404, detail="Job not found")
+    job = await find_job(job_id)
     
-    return jobs[job_id]
+    return job
 
 if __name__ == "__main__":
+    # Single worker on purpose: in-flight job state lives in this process's JobStore.
+    # loop/http default to "auto", i.e. uvloop and httptools when installed
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
+        reload=DEVELOPMENT
     )
\ No newline at end of file
@@ -0,0 +1,36 @@
+import os
+import sys
+import uuid
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import main  # noqa: E402
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+
+
+@pytest.fixture
+def job_id():
+    job_id = str(uuid.uuid4())
+    main.jobs.create(job_id, {"status": "processing", "progress": 0, "message": ""})
+    return job_id
+
+
+@pytest.fixture
+def read_frames(tmp_path):
+    """Parse CSV text into the per-block frames extract_file yields."""
+    def read(text: str, block_size: int = main.CSV_BLOCK_SIZE):
+        path = tmp_path / "input.csv"
+        path.write_text(text)
+        source = pa.memory_map(str(path), "r")
+        reader = pacsv.open_csv(
+            source,
+            read_options=pacsv.ReadOptions(block_size=block_size),
+            convert_options=main._csv_convert_options(str(path)),
+        )
+        return list(main._stream_frames(source, reader))
+    return read
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+import main
+
+HEADER = "study_id,participant_id,measurement_type,value,unit,timestamp,site_id,quality_score\n"
+
+
+def transformed(job_id, frames):
+    return [main.transform_data(job_id, df) for df in frames]
+
+
+def test_bucket_split_across_blocks_merges_like_one_chunk(job_id, read_frames):
+    # Same day/participant/type on both sides of a block boundary; the
+    # second block has no quality scores at all
+    text = (HEADER
+            + "S1,P1,glucose,90,mg/dL,2024-01-15T08:00:00Z,A,0.90\n"
+            + "S1,P1,glucose,100,mg/dL,2024-01-15T09:00:00Z,A,0.96\n"
+            + "S1,P1,glucose,110,mg/dL,2024-01-15T10:00:00Z,A,\n"
+            + "S1,P1,glucose,120,mg/dL,2024-01-15T11:00:00Z,A,\n")
+    blocks = transformed(job_id, read_frames(text, block_size=len(HEADER) + 100))
+    assert len(blocks) == 2
+    [whole] = transformed(job_id, read_frames(text))
+
+    merged = main._merge_daily_partials([main._daily_partials(df) for df in blocks])
+    single = main._merge_daily_partials([main._daily_partials(whole)])
+    pd.testing.assert_frame_equal(merged, single)
+
+    [row] = merged.to_dict('records')
+    assert row['measurement_count'] == 4
+    assert row['avg_value'] == 105
+    assert row['avg_quality_score'] == pytest.approx(0.93)  # over the two scored rows only
+    assert row['low_quality_count'] == 1
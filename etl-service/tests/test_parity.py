@@ -0,0 +1,189 @@
+"""
+Ids and daily aggregates must match what the original row-by-row loader
+stored: pd.read_csv, its transform, to_csv into COPY, and Postgres'
+generated columns and AVG/SUM over the stored rows.
+"""
+import csv
+import glob
+import hashlib
+import io
+import os
+import re
+import uuid
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+import pandas as pd
+import pytest
+import pytz
+from dateutil import parser
+
+import main
+from conftest import DATA_DIR
+
+HEADER = "study_id,participant_id,measurement_type,value,unit,timestamp,site_id,quality_score\n"
+
+
+# --- the original implementation ------------------------------------------
+
+def baseline_make_deterministic_id(row) -> str:
+    key = "|".join(
+        str(row[col]) for col in (
+            'study_id', 'participant_id', 'timestamp',
+            'measurement_type', 'value'
+        )
+    )
+    return str(uuid.UUID(hashlib.md5(key.encode("utf-8")).hexdigest()))
+
+
+def baseline_frame(text: str) -> pd.DataFrame:
+    df = pd.read_csv(io.StringIO(text))
+    df.columns = [c.lower().strip().replace(" ", "_") for c in df.columns]
+    df['timestamp'] = df['timestamp'].apply(lambda t: parser.isoparse(t).astimezone(pytz.UTC))
+    df['quality_score'] = pd.to_numeric(df['quality_score'], errors='coerce')
+    df['quality_score'] = df['quality_score'].clip(lower=0, upper=1)
+    for col in ['study_id', 'participant_id', 'measurement_type', 'unit', 'site_id']:
+        if col in df:
+            df[col] = df[col].astype(str).str.strip()
+    df.insert(0, 'id', df.apply(baseline_make_deterministic_id, axis=1))
+    return df
+
+
+def baseline_stored_rows(text: str) -> list:
+    """The COPY text the original loader sent, as Postgres would store it."""
+    df = baseline_frame(text)
+    buf = io.StringIO()
+    df[['id', 'study_id', 'participant_id', 'measurement_type', 'value',
+        'timestamp', 'site_id', 'quality_score']].to_csv(buf, index=False, header=False)
+    return [postgres_row(*fields) for fields in csv.reader(io.StringIO(buf.getvalue()))]
+
+
+def postgres_row(id, study_id, participant_id, measurement_type, value, timestamp, site_id, quality):
+    # TIMESTAMP drops the "+00:00"; DECIMAL(3,2) rounds half away from zero
+    value = value.strip(' ')
+    bp = re.fullmatch(r'([0-9]+)/([0-9]+)', value)
+    return {
+        'id': id,
+        'key': (timestamp[:10], study_id, site_id, participant_id, measurement_type),
+        'value_num': float(value) if re.fullmatch(r'[0-9]+(\.[0-9]+)?', value) else None,
+        'bp_systolic': int(bp[1]) if bp else None,
+        'bp_diastolic': int(bp[2]) if bp else None,
+        'quality_score': Decimal(quality).quantize(Decimal('0.01'), ROUND_HALF_UP) if quality else None,
+    }
+
+
+def baseline_aggregates(text: str) -> dict:
+    """The original per-file GROUP BY over the stored rows."""
+    groups = defaultdict(list)
+    for row in baseline_stored_rows(text):
+        groups[row['key']].append(row)
+
+    def avg(values):
+        values = [v for v in values if v is not None]
+        return float(sum(values) / len(values)) if values else None
+
+    out = {}
+    for key, rows in groups.items():
+        values = [r['value_num'] for r in rows if r['value_num'] is not None]
+        quality = [r['quality_score'] for r in rows if r['quality_score'] is not None]
+        out[key] = {
+            'measurement_count': len(rows),
+            'avg_value': avg(values),
+            'min_value': min(values, default=None),
+            'max_value': max(values, default=None),
+            'avg_systolic': avg([r['bp_systolic'] for r in rows]),
+            'avg_diastolic': avg([r['bp_diastolic'] for r in rows]),
+            'avg_quality_score': avg(quality),
+            'low_quality_count': sum(q < Decimal('0.95') for q in quality) if quality else None,
+        }
+    return out
+
+
+# --- this tree ------------------------------------------------------------
+
+def new_frames(job_id, read_frames, text, block_size=main.CSV_BLOCK_SIZE):
+    frames = [main.transform_data(job_id, df) for df in read_frames(text, block_size)]
+    for df in frames:
+        assert df is not None, main.jobs.get(job_id)['message']
+    return frames
+
+
+def new_ids(frames) -> list:
+    return [i for df in frames for i in main.make_deterministic_ids(df).tolist()]
+
+
+def new_aggregates(frames) -> dict:
+    agg = main._merge_daily_partials([main._daily_partials(df) for df in frames])
+    out = {}
+    for row in agg.astype(object).where(agg.notna(), None).to_dict('records'):
+        key = (str(row.pop('agg_day')),) + tuple(str(row.pop(c)) for c in main.AGG_KEY_COLUMNS[1:])
+        out[key] = row
+    return out
+
+
+# --- cases ----------------------------------------------------------------
+
+def rows(measurement_type, *fields) -> str:
+    """One CSV row per (value, timestamp, quality_score) for participant P1."""
+    return HEADER + "".join(
+        f"S1,P1,{measurement_type},{value},u,{ts},SITE_A,{quality}\n" for value, ts, quality in fields
+    )
+
+
+TS = "2024-01-15T09:30:0{}Z"
+
+EDGE_CASES = {
+    "float": rows("glucose", *[(v, TS.format(i), "0.9") for i, v in enumerate(["95.5", "180", "68.5"])]),
+    "int": rows("heart_rate", *[(v, TS.format(i), "0.9") for i, v in enumerate(["95", "70", "+5", "007"])]),
+    "int-with-null": rows("heart_rate", *[(v, TS.format(i), "0.9") for i, v in enumerate(["95", "", "70"])]),
+    "mixed-bp": rows("blood_pressure", *[(v, TS.format(i), "0.9") for i, v in enumerate(["120/80", "95", "118/79"])]),
+    "exponent": rows("glucose", *[(v, TS.format(i), "0.9") for i, v in enumerate(["1e2", "2.5E-1", "95"])]),
+    "null-quality": rows("glucose", ("90", TS.format(0), ""), ("91", TS.format(1), "0.8"),
+                         ("92", "2024-01-16T09:30:00Z", "")),
+    "timestamps": rows("glucose",
+                       ("90", "2024-01-15T09:30:00.250Z", "0.9"),
+                       ("91", "2024-01-15T09:30:00.123456789Z", "0.9"),
+                       ("92", "2024-01-15T09:30:00+05:30", "0.9"),
+                       ("93", "2024-01-15T23:30:00-02:00", "0.9"),
+                       ("94", "2024-01-15T00:30:00.5+01:00", "0.9")),
+    "quality-near-half": rows("glucose", *[
+        ("90", TS.format(i), q) for i, q in enumerate(
+            ["0.945", "0.955", "0.94499999", "0.9949999999", "0.985", "0.005", "1.2", "-0.1"])
+    ]),
+}
+
+SAMPLE_FILES = sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+
+
+def case_params():
+    params = [pytest.param(text, id=name) for name, text in EDGE_CASES.items()]
+    for path in SAMPLE_FILES:
+        with open(path) as f:
+            params.append(pytest.param(f.read(), id=os.path.basename(path)))
+    return params
+
+
+@pytest.mark.parametrize("text", case_params())
+def test_ids_match_baseline(job_id, read_frames, text):
+    frames = new_frames(job_id, read_frames, text)
+    assert new_ids(frames) == baseline_frame(text)['id'].tolist()
+
+
+@pytest.mark.parametrize("text", case_params())
+def test_aggregates_match_baseline(job_id, read_frames, text):
+    got = new_aggregates(new_frames(job_id, read_frames, text))
+    expected = baseline_aggregates(text)
+    assert got.keys() == expected.keys()
+    for key, row in expected.items():
+        assert got[key] == pytest.approx(row), key
+
+
+@pytest.mark.parametrize("path", SAMPLE_FILES, ids=os.path.basename)
+def test_aggregates_independent_of_block_layout(job_id, read_frames, path):
+    with open(path) as f:
+        text = f.read()
+    whole = new_aggregates(new_frames(job_id, read_frames, text))
+    split = new_aggregates(new_frames(job_id, read_frames, text, block_size=len(text) // 3))
+    assert split.keys() == whole.keys()
+    for key, row in whole.items():
+        assert split[key] == pytest.approx(row), key
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import main
+
+HEADER = "study_id,participant_id,measurement_type,value,unit,timestamp,site_id,quality_score\n"
+
+
+def test_parses_offset_and_fractional_timestamps(job_id, read_frames):
+    [df] = read_frames(HEADER
+                       + "S1,P1,glucose,95,mg/dL,2024-01-15T09:30:00+05:30,A,0.9\n"
+                       + "S1,P1,glucose,96,mg/dL,2024-01-15T09:30:00.250Z,A,0.9\n"
+                       + "S1,P1,glucose,97,mg/dL,2024-01-15T09:30:00.123456789Z,A,0.9\n")
+    out = main.transform_data(job_id, df)
+    assert out['timestamp'].tolist() == [
+        pd.Timestamp("2024-01-15 04:00:00", tz="UTC"),
+        pd.Timestamp("2024-01-15 09:30:00.250", tz="UTC"),
+        pd.Timestamp("2024-01-15 09:30:00.123456", tz="UTC"),
+    ]
+
+
+def test_out_of_range_timestamp_fails_transform(job_id, read_frames):
+    for ts in ("9999-12-31T00:00:00Z", "1500-01-01T00:00:00Z"):
+        [df] = read_frames(HEADER + f"S1,P1,glucose,95,mg/dL,{ts},A,0.9\n")
+        assert main.transform_data(job_id, df) is None
+        job = main.jobs.get(job_id)
+        assert job['status'] == 'failed'
+        assert job['message'].startswith('Transform error:')
+
+
+def test_missing_timestamp_fails_transform(job_id, read_frames):
+    [df] = read_frames(HEADER + "S1,P1,glucose,95,mg/dL,,A,0.9\n")
+    assert main.transform_data(job_id, df) is None
+    assert main.jobs.get(job_id)['message'] == 'Transform error: Missing timestamp in 1 rows'
+
+
+def test_quality_score_copied_with_input_digits(job_id, read_frames):
+    # Postgres rounds the COPY text into DECIMAL(3,2), so it must be the input's
+    [df] = read_frames(HEADER
+                       + "S1,P1,glucose,95,mg/dL,2024-01-15T09:30:00Z,A,0.94499999\n"
+                       + "S1,P1,glucose,96,mg/dL,2024-01-15T09:30:01Z,A,0.9949999999\n"
+                       + "S1,P1,glucose,97,mg/dL,2024-01-15T09:30:02Z,A,1.7\n")
+    out = main.transform_data(job_id, df)
+    text = main._copy_table(out.assign(id='x'))['quality_score'].cast('string').to_pylist()
+    assert text == ['0.94499999', '0.9949999999', '1']
+
+
+@pytest.mark.parametrize("values, stored", [
+    (["95", "+5", "007"], ["95", "5", "7"]),
+    (["180", "95.5", "1e2", ""], ["180.0", "95.5", "100.0", None]),
+    (["120/80", "95", ""], ["120/80", "95", None]),
+])
+def test_value_stored_as_read_csv_typed_it(job_id, read_frames, values, stored):
+    [df] = read_frames(HEADER + "".join(
+        f"S1,P1,glucose,{v},mg/dL,2024-01-15T09:30:0{i}Z,A,0.9\n" for i, v in enumerate(values)))
+    out = main.transform_data(job_id, df)
+    assert out['value'].astype(object).where(out['value'].notna(), None).tolist() == stored